@@ -1,8 +1,8 @@
-from six.moves import queue
 import numpy as np
 import pyaudio
 import wave
 
+from .RingBuffer import RingBuffer
 from .utils import audio_resample
 
 
@@ -16,6 +16,11 @@ class AudioInputStreamer(object):
     BLOCKS_PER_SECOND = 50
     PA_FORMAT = pyaudio.paFloat32
     FILE_CHUNK = 320
+    # hardware buffer size, decoupled from the block size, as small callback
+    # buffers cause underruns/jitter; blocks are re-chunked from the buffer
+    FRAMES_PER_BUFFER = 4096
+    RING_BUFFER_BLOCKS = 32
+    READ_TIMEOUT = 0.05
 
     FMT2TYPE = {
         pyaudio.paInt8: np.int8,
@@ -35,6 +40,7 @@ class AudioInputStreamer(object):
         file_path=None,
         file_chunk=FILE_CHUNK,
         callback=None,
+        frames_per_buffer=FRAMES_PER_BUFFER,
     ):
 
         self.sample_rate = sample_rate
@@ -46,9 +52,26 @@ class AudioInputStreamer(object):
         self.processing_block_size = processing_rate // blocks_per_second
 
         self.pa_format = pa_format
-        self._buff = queue.Queue()
+        self.sample_width = np.dtype(self.FMT2TYPE[pa_format]).itemsize * channels
+        self.sample_block_bytes = self.sample_block_size * self.sample_width
+        if file_path is not None:
+            # file_chunk frames are read per callback, so callbacks must pace it
+            frames_per_buffer = file_chunk
+        self.frames_per_buffer = frames_per_buffer
+
+        # smallest power of 2 able to hold RING_BUFFER_BLOCKS blocks or
+        # hardware buffers, whichever are larger
+        ring_bytes = self.RING_BUFFER_BLOCKS * max(
+            self.sample_block_bytes, frames_per_buffer * self.sample_width
+        )
+        self._ring_size = 1 << (ring_bytes - 1).bit_length()
         self._callback = callback if callback is not None else self._fill_buffer
 
+        # buffer and resampling state are replaced for every session, see _start
+        self._buff = RingBuffer(self._ring_size)
+        self._buff.close()
+        self._resample_state = dict()
+
         self.device = device
         if file_path is not None:
             self.file_chunk = file_chunk
@@ -58,6 +81,15 @@ class AudioInputStreamer(object):
 
     def _start(self):
 
+        # a fresh buffer and resampling state for every session, so that a
+        # reader left over from a previous session, e.g. the request thread of
+        # a failed streaming recognize call, can not consume this session's
+        # data, nor is data left over from that session streamed in this one
+        self._buff = RingBuffer(self._ring_size)
+        self._resample_state = dict()
+        # prefill a block of silence so that the first read does not have to
+        # wait for the first, larger, hardware buffer to be filled
+        self._buff.write(bytes(self.sample_block_bytes))
         self._pa = pyaudio.PyAudio()
 
         kwargs = {
@@ -66,7 +98,7 @@ class AudioInputStreamer(object):
             "rate": self.sample_rate,
             "input": True,
             "input_device_index": self.device,
-            "frames_per_buffer": self.sample_block_size,
+            "frames_per_buffer": self.frames_per_buffer,
             "stream_callback": self._stream_callback,
         }
 
@@ -82,21 +114,26 @@ class AudioInputStreamer(object):
     def _stop(self):
         self._audio_stream.stop_stream()
         self._audio_stream.close()
-        self.closed = True
         """Signal the generator to terminate so that in case of web-based clients
         such as Google cloud speech to text, the streaming recognize method 
         will not block the process termination."""
-        self._buff.put(None)
+        self.closed = True
+        self._buff.close()
         self._pa.terminate()
 
         return self
 
     def __exit__(self, exception_type, exception_value, traceback):
-        return self._stop()
+        # exceptions raised while streaming are propagated, not swallowed
+        self._stop()
 
     def _fill_buffer(self, in_data):
-        """Continuously collect data from the audio stream, into the buffer."""
-        self._buff.put(in_data)
+        """Continuously collect data from the audio stream, into the buffer.
+        Data not fitting in the buffer, i.e. when the reader lags, is dropped
+        in whole frames so that the buffered data stays frame aligned."""
+        num_bytes = min(len(in_data), self._buff.write_available())
+        num_bytes -= num_bytes % self.sample_width
+        self._buff.write(memoryview(in_data)[:num_bytes])
 
     def _stream_callback(self, in_data, frame_count, time_info, status_flags):
         r"""Callback to be passed to pyaudio"""
@@ -105,37 +142,97 @@ class AudioInputStreamer(object):
         self._callback(in_data)
         return None, pyaudio.paContinue
 
-    def read_resampled(self):
-        """Return a block of audio data resampled to 16000hz, blocking if necessary."""
-        try:
+    def _resample(self, data, state):
+        if data is not None:
             data = audio_resample(
-                data=self._buff.get(),
+                data=data,
                 sample_rate=self.sample_rate,
                 resample_rate=self.processing_rate,
-                dtype=FMT2TYPE[self.pa_format],
+                dtype=self.FMT2TYPE[self.pa_format],
+                state=state,
             )
-        except queue.Empty:
-            data = None
         return data
 
-    def read(self):
-        """Return a block of audio data, blocking if necessary."""
-        try:
-            data = self._buff.get()
-        except queue.Empty:
-            data = None
-        return data
+    def read_resampled(self):
+        """Return a block of audio data resampled to 16000hz, blocking if necessary."""
+        return self._resample(self.read(), self._resample_state)
 
-    def _stream(self):
-        while not self.closed:
-            read_fn = (
-                self.read
-                if self.sample_rate == self.processing_rate
-                else self.read_resampled
+    def read(self):
+        """Return a block of audio data, blocking if necessary. None is returned
+        once the stream is closed and no complete block is left to be read."""
+        return self._read_block(self._buff)
+
+    def _read_block(self, buff):
+        while buff.read_available() < self.sample_block_bytes:
+            if buff.closed:
+                return None
+            buff.wait_readable(
+                timeout=self.READ_TIMEOUT, num_bytes=self.sample_block_bytes
             )
+        return buff.read(self.sample_block_bytes)
+
+    def read_buffered(self, min_bytes=0, max_bytes=None):
+        """Return buffered audio data, up to max_bytes (default all), as a
+        single chunk of whole frames, once at least min_bytes are buffered,
+        blocking if necessary. None is returned once the stream is closed and
+        no frame is left to be read."""
+        return self._read_buffered(self._buff, min_bytes, max_bytes)
+
+    def _read_buffered(self, buff, min_bytes, max_bytes):
+        if max_bytes is None:
+            max_bytes = buff.size
+        max_bytes = max(max_bytes - max_bytes % self.sample_width, self.sample_width)
+
+        # a full buffer has to be read even if min_bytes exceeds its size
+        min_bytes = min(max(min_bytes, self.sample_width), max_bytes, buff.size)
+        while True:
+            num_bytes = buff.read_available()
+            # once closed, a trailing partial frame is left unread so as to end
+            if num_bytes >= min_bytes or (
+                buff.closed and num_bytes >= self.sample_width
+            ):
+                num_bytes = min(num_bytes, max_bytes)
+                num_bytes -= num_bytes % self.sample_width
+                return buff.read(num_bytes)
+            if buff.closed:
+                return None
+            buff.wait_readable(timeout=self.READ_TIMEOUT, num_bytes=min_bytes)
+
+    def _stream(self, min_duration_ms=None, max_duration_ms=None):
+        r"""Return a generator of consecutive blocks of audio data or, with
+        min_duration_ms, whatever is buffered, up to max_duration_ms, once at
+        least min_duration_ms of audio is, so that consumers receive fewer but
+        larger chunks, copied once from the buffer. The generator is bound to
+        the current session and ends once that session is closed."""
+        buff, resample_state = self._buff, self._resample_state
+
+        if min_duration_ms is None:
+            read_fn = lambda: self._read_block(buff)
+        else:
+            bytes_per_ms = self.sample_rate * self.sample_width / 1000
+            min_bytes = int(bytes_per_ms * min_duration_ms)
+            max_bytes = None
+            if max_duration_ms is not None:
+                max_bytes = int(bytes_per_ms * max_duration_ms)
+
+            read_fn = lambda: self._read_buffered(buff, min_bytes, max_bytes)
+
+        resample = self.sample_rate != self.processing_rate
+
+        def generate():
             while True:
-                yield read_fn()
-
-    def stream(self):
-        r"""Generator that yields series of consecutive audio frames."""
-        yield from self._stream()
+                data = read_fn()
+                if data is None:
+                    return
+                yield self._resample(data, resample_state) if resample else data
+
+        return generate()
+
+    def stream(self, min_duration_ms=0, max_duration_ms=None):
+        r"""Generator that yields series of consecutive audio frames, at least
+        min_duration_ms long except possibly the last one, and at most
+        max_duration_ms long, if given, with more buffered data yielded over
+        consecutive chunks."""
+        return self._stream(
+            min_duration_ms=min_duration_ms, max_duration_ms=max_duration_ms
+        )
@@ -1,6 +1,6 @@
 import threading
 
-from six.moves.queue import Queue
+from queue import Queue
 
 import pyaudio
 import rospy
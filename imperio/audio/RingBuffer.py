@@ -0,0 +1,91 @@
+import threading
+
+
+class RingBuffer(object):
+    r"""Lock-free single producer, single consumer ring buffer of bytes. The
+    producer (e.g. the pyaudio callback thread) only advances the write index
+    and the consumer only advances the read index, so data is handed over
+    without a lock. The producer takes a lock only to wake up a consumer that
+    is blocked in wait_readable. size must be a power of 2."""
+
+    def __init__(self, size):
+        if size <= 0 or size & (size - 1):
+            raise ValueError("size must be a positive power of 2, got {}".format(size))
+
+        self.size = size
+        self._mask = size - 1
+        self._data = bytearray(size)
+        self._view = memoryview(self._data)
+
+        # indices grow monotonically and are wrapped only on access
+        self._write_idx = 0
+        self._read_idx = 0
+        self._readable = threading.Event()
+        self._waiting = False
+        self.closed = False
+
+    def read_available(self):
+        r"""Number of bytes that can be read."""
+        return self._write_idx - self._read_idx
+
+    def write_available(self):
+        r"""Number of bytes that can be written without overwriting unread data."""
+        return self.size - self.read_available()
+
+    def write(self, data):
+        r"""Copy as much of data into the buffer as fits and return the number
+        of bytes written. To be called from the producer thread only."""
+        data = memoryview(data).cast("B")
+        n = min(len(data), self.write_available())
+
+        start = self._write_idx & self._mask
+        first = min(n, self.size - start)
+        self._view[start : start + first] = data[:first]
+        self._view[: n - first] = data[first:n]
+
+        # publish the data only after it has been copied, and signal only a
+        # waiting consumer, as setting the event takes its lock
+        self._write_idx += n
+        if self._waiting:
+            self._readable.set()
+
+        return n
+
+    def read(self, n=None):
+        r"""Return up to n (default all available) bytes as a single bytes
+        object. To be called from the consumer thread only."""
+        available = self.read_available()
+        n = available if n is None else min(n, available)
+
+        start = self._read_idx & self._mask
+        first = min(n, self.size - start)
+        if first == n:
+            data = bytes(self._view[start : start + n])
+        else:
+            data = b"".join((self._view[start:], self._view[: n - first]))
+
+        self._read_idx += n
+
+        return data
+
+    def close(self):
+        r"""Mark the buffer as closed, i.e. no more data is to be written, and
+        wake up a waiting consumer. May be called from any thread."""
+        self.closed = True
+        self._readable.set()
+
+    def wait_readable(self, timeout=None, num_bytes=1):
+        r"""Block until num_bytes are available to be read, the next write in
+        case fewer are, or timeout (in seconds) expires. Return True if at
+        least num_bytes are available to be read."""
+        self._waiting = True
+        self._readable.clear()
+        try:
+            # re-check after announcing the wait so that a write publishing its
+            # data before seeing the consumer waiting, or closing, is not missed
+            if self.closed or self.read_available() >= num_bytes:
+                return self.read_available() >= num_bytes
+            self._readable.wait(timeout)
+            return self.read_available() >= num_bytes
+        finally:
+            self._waiting = False
@@ -14,6 +14,7 @@ class VADAudioInputStreamer(AudioInputStreamer):
     BLOCKS_PER_SECOND = AudioInputStreamer.BLOCKS_PER_SECOND
     PA_FORMAT = AudioInputStreamer.PA_FORMAT
     FILE_CHUNK = AudioInputStreamer.FILE_CHUNK
+    FRAMES_PER_BUFFER = AudioInputStreamer.FRAMES_PER_BUFFER
     FMT2TYPE = AudioInputStreamer.FMT2TYPE
 
     def __init__(
@@ -30,6 +31,7 @@ class VADAudioInputStreamer(AudioInputStreamer):
         file_path=None,
         file_chunk=FILE_CHUNK,
         callback=None,
+        frames_per_buffer=FRAMES_PER_BUFFER,
     ):
         r"""aggressiveness is an integer between 0 and 3, 0 being the least 
         aggressive about filtering out non-speech while 3 being the most."""
@@ -44,6 +46,7 @@ class VADAudioInputStreamer(AudioInputStreamer):
             file_path=file_path,
             file_chunk=file_chunk,
             callback=callback,
+            frames_per_buffer=frames_per_buffer,
         )
 
         self.vad = webrtcvad.Vad(aggressiveness)
@@ -52,15 +55,18 @@ class VADAudioInputStreamer(AudioInputStreamer):
         frame_dur_ms = (self.processing_block_size * 1000) // self.processing_rate
         self.num_padding_frames = padding_dur_ms // frame_dur_ms
 
+        # int16 frames are fed to VAD as is, without a conversion call
         self._dtype_conv_fn = (
-            audio_float2int
-            if self.pa_format == pyaudio.paFloat32
-            else lambda frame, float_type, int_type: frame
+            audio_float2int if self.pa_format == pyaudio.paFloat32 else None
         )
 
-    def stream(self):
+    def stream(self, min_duration_ms=0, max_duration_ms=None):
+        r"""Generator that yields voiced audio segments, each followed by a None
+        to mark a break in speech. Segment lengths are decided by VAD, so
+        min_duration_ms and max_duration_ms, accepted for compatibility with
+        AudioInputStreamer.stream, are ignored."""
 
-        yield from vad_collector(
+        return vad_collector(
             self._stream(),
             vad=self.vad,
             sample_rate=self.processing_rate,
@@ -1,3 +1,4 @@
+from .RingBuffer import RingBuffer
 from .AudioOutputStreamer import AudioOutputStreamer
 from .AudioInputStreamer import AudioInputStreamer
 from .VADAudioInputStreamer import VADAudioInputStreamer
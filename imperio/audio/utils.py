@@ -1,19 +1,100 @@
+import math
 import numpy as np
 from scipy import signal
 from collections import deque
+from functools import lru_cache
 import webrtcvad
 
 
-def audio_resample(data, sample_rate, resample_rate, dtype=None):
+@lru_cache(maxsize=8)
+def _resample_filter(sample_rate, resample_rate):
+    r"""Upsampling and downsampling factors, and the anti-aliasing FIR filter
+    for polyphase resampling. The filter is the one resample_poly designs by
+    default, which can be thousands of taps long for rates such as 44100 to
+    16000, so it is designed once per rate pair instead of once per block."""
+    gcd = math.gcd(sample_rate, resample_rate)
+    up, down = resample_rate // gcd, sample_rate // gcd
+
+    max_rate = max(up, down)
+    fir = signal.firwin(20 * max_rate + 1, 1.0 / max_rate, window=("kaiser", 5.0))
+    fir.flags.writeable = False
+
+    return up, down, fir
+
+
+@lru_cache(maxsize=8)
+def _padded_resample_filter(sample_rate, resample_rate, pad):
+    r"""The resampling FIR filter scaled by the upsampling factor, as upfirdn
+    expects it, and front padded with pad zeros to shift it into phase. Blocks
+    of a constant duration need the same pad, or a few cycling ones, so only
+    a few of the down possible filters are cached at a time."""
+    up, down, fir = _resample_filter(sample_rate, resample_rate)
+
+    padded_fir = np.zeros(pad + len(fir))
+    np.multiply(fir, up, out=padded_fir[pad:])
+    padded_fir.flags.writeable = False
+
+    return padded_fir
+
+
+def _resample_block(data, sample_rate, resample_rate, state):
+    r"""Polyphase resample a block of a stream, carrying the filter history
+    over in state so that consecutive blocks are filtered as one continuous
+    signal. The output is the same as resampling the whole signal at once,
+    delayed by a fixed number of output samples so as to not depend on
+    samples of the next block, and each block yields the number of samples
+    it accounts for at the resampled rate."""
+
+    up, down, fir = _resample_filter(sample_rate, resample_rate)
+    half_len = (len(fir) - 1) // 2
+    delay = -(-(half_len + up) // down)
+    num_history = (len(fir) + 2 * down) // up + 2
+
+    if not state:
+        # the stream is taken to be silent before its first block
+        state.update(history=np.zeros(num_history), num_in=0, num_out=0)
+
+    # global index of the first sample filtered, history included
+    start = state["num_in"] - len(state["history"])
+    samples = np.concatenate((state["history"], data))
+
+    num_in = state["num_in"] + len(data)
+    num_out = num_in * up // down
+    first = state["num_out"]
+
+    # upsampled position, relative to start, at which the first output of the
+    # block is centred; the filter is front padded to bring it into phase
+    pos = (first - delay) * down + half_len - start * up
+    pad = -pos % down
+    padded_fir = _padded_resample_filter(sample_rate, resample_rate, pad)
+    filtered = signal.upfirdn(padded_fir, samples, up, down)
+
+    first_pos = (pos + pad) // down
+    data = filtered[first_pos : first_pos + num_out - first]
+
+    state.update(history=samples[-num_history:], num_in=num_in, num_out=num_out)
+
+    return data
+
+
+def audio_resample(data, sample_rate, resample_rate, dtype=None, state=None):
     """
     Microphone/Audio source may not support native processing sample rate, so
     resample from given sample_rate for webrtcvad/subsequent processing.
+    Polyphase filtering is used as, unlike FFT based resampling, its cost does
+    not depend on the prime factors of the block length. For a stream resampled
+    block by block, state is a dict, empty at the start of the stream, through
+    which the filter history is carried over to avoid clicks at block edges.
     """
     if dtype is not None:
         data = np.frombuffer(data, dtype=dtype)
 
-    size = (len(data) * self.resample_rate) // self.sample_rate
-    data = signal.resample(data, size)
+    if sample_rate != resample_rate:
+        if state is None:
+            up, down, fir = _resample_filter(sample_rate, resample_rate)
+            data = signal.resample_poly(data, up, down, window=fir)
+        else:
+            data = _resample_block(data, sample_rate, resample_rate, state)
 
     if dtype is not None:
         data = np.array(data, dtype=dtype).tobytes()
@@ -21,26 +102,46 @@ def audio_resample(data, sample_rate, resample_rate, dtype=None):
     return data
 
 
-def audio_float2int(data, float_type=None, int_type=np.int16):
-    r"""Convert an audio array from float type to int type.
-    float_type is REQUIRED when data is bytes object."""
-
-    if float_type is not None:
-        data = np.frombuffer(data, dtype=float_type)
+@lru_cache(maxsize=16)
+def _float2int_converter(float_type, int_type):
+    r"""Build a float to int conversion function specialised for the given
+    pair of types, with the scale and clip bounds computed once. float_type
+    is None for conversion of arrays rather than bytes objects."""
 
     int_info = np.iinfo(int_type)
     abs_max = 2 ** (int_info.bits - 1)
-    data = (data * abs_max).clip(int_info.min, int_info.max).astype(int_type)
+    int_min, int_max = int_info.min, int_info.max
 
-    if float_type is not None:
-        data = data.tobytes()
+    def convert(data, out=None):
+        if out is None:
+            out = np.empty(data.shape, dtype=int_type)
 
-    return data
+        # saturating cast of the scaled temporary straight into the int output
+        scaled = np.multiply(data, abs_max)
+        np.clip(scaled, int_min, int_max, out=out, casting="unsafe")
+        return out
+
+    if float_type is None:
+        return convert
 
+    def convert_bytes(data, out=None):
+        return convert(np.frombuffer(data, dtype=float_type), out=out).tobytes()
 
-def audio_int2float(data, int_type=None, float_type=np.float32):
+    return convert_bytes
+
+
+def audio_float2int(data, float_type=None, int_type=np.int16, out=None):
+    r"""Convert an audio array from float type to int type.
+    float_type is REQUIRED when data is bytes object. out is an optional
+    preallocated int_type array, of the same shape as data, to write into."""
+
+    return _float2int_converter(float_type, int_type)(data, out=out)
+
+
+def audio_int2float(data, int_type=None, float_type=np.float32, out=None):
     r"""Convert an audio array from int type to float type.
-    int_type is REQUIRED when data is bytes object."""
+    int_type is REQUIRED when data is bytes object. out is an optional
+    preallocated float_type array, of the same shape as data, to write into."""
 
     if int_type is not None:
         data = np.frombuffer(data, dtype=int_type)
@@ -49,7 +150,8 @@ def audio_int2float(data, int_type=None, float_type=np.float32):
         int_info = np.iinfo(data.dtype)
 
     abs_max = 2 ** (int_info.bits - 1)
-    data = data.astype(float_type) / abs_max
+    # cast and scale in a single pass without an intermediate float array
+    data = np.multiply(data, 1.0 / abs_max, out=out, dtype=float_type)
 
     if int_type is not None:
         data = data.tobytes()
@@ -57,52 +159,112 @@ def audio_int2float(data, int_type=None, float_type=np.float32):
     return data
 
 
+def vad_is_speech(vad, frame, sample_rate, subframe_dur_ms=20):
+    r"""webrtcvad only accepts 10, 20 or 30 ms frames of int16 audio, so longer
+    frames are split, without copying, into subframe_dur_ms long views and a
+    majority vote of the subframes decides whether the frame is speech."""
+
+    subframe_bytes = 2 * sample_rate * subframe_dur_ms // 1000
+    frame = memoryview(frame)
+    num_subframes = len(frame) // subframe_bytes
+
+    num_voiced = 0
+    for start in range(0, num_subframes * subframe_bytes, subframe_bytes):
+        num_voiced += vad.is_speech(frame[start : start + subframe_bytes], sample_rate)
+
+    return 2 * num_voiced > num_subframes
+
+
 def vad_collector(
     streamer,
     vad=webrtcvad.Vad(3),
     sample_rate=16000,
     num_padding_frames=20,
     act_inact_ratio=0.9,
-    frame_dtype_conv_fn=lambda frame, float_type, int_type: frame,
+    frame_dtype_conv_fn=None,
 ):
     r"""VAD based generator that yields voiced audio frames followed by a None 
     to mark end/break in speech. Collection of voiced frames is based on voice
-    activity/inactivity ratio in num_padding_frames.
+    activity/inactivity ratio in num_padding_frames. frame_dtype_conv_fn, if
+    given, converts frames to int16 for VAD, otherwise frames are used as is.
     """
 
-    ring_buff = deque(maxlen=num_padding_frames)
+    if num_padding_frames < 1:
+        raise ValueError(
+            "num_padding_frames must be at least 1, got {}; padding duration "
+            "has to be at least a frame long".format(num_padding_frames)
+        )
+
+    # speech flags and frames are kept in separate ring buffers, frames being
+    # needed only while not triggered, and the number of voiced flags is kept
+    # as a running count rather than recounted for every frame
+    ring_flags = np.zeros(num_padding_frames, dtype=np.bool_)
+    ring_head = 0
+    num_flags = 0
+    num_voiced = 0
+    ring_frames = deque(maxlen=num_padding_frames)
+    threshold = act_inact_ratio * num_padding_frames
+
+    # longest frame, in bytes of int16 audio, accepted by webrtcvad as is
+    max_vad_frame_bytes = 2 * sample_rate * 30 // 1000
+
     triggered = False
-    voiced_frames = list()
+    voiced_frames = bytearray()
+
+    # bound once to spare attribute lookups in the per frame loop
+    is_speech_fn = vad.is_speech
+    append_frame = ring_frames.append
 
     for frame in streamer:
 
-        vad_frame = frame_dtype_conv_fn(frame, float_type=np.float32, int_type=np.int16)
-        is_speech = vad.is_speech(vad_frame, sample_rate)
+        if frame_dtype_conv_fn is None:
+            vad_frame = frame
+        else:
+            vad_frame = frame_dtype_conv_fn(
+                frame, float_type=np.float32, int_type=np.int16
+            )
+
+        if len(vad_frame) > max_vad_frame_bytes:
+            is_speech = vad_is_speech(vad, vad_frame, sample_rate)
+        else:
+            is_speech = is_speech_fn(vad_frame, sample_rate)
+
+        # flags are cleared to False, so an evicted flag is voiced only if it
+        # was set after the last clear
+        num_voiced += is_speech - ring_flags.item(ring_head)
+        ring_flags[ring_head] = is_speech
+        ring_head += 1
+        if ring_head == num_padding_frames:
+            ring_head = 0
+        if num_flags < num_padding_frames:
+            num_flags += 1
 
         if not triggered:
-            ring_buff.append((frame, is_speech))
-            num_voiced = len([f for f, speech in ring_buff if speech])
+            append_frame(frame)
 
-            if num_voiced > (act_inact_ratio * ring_buff.maxlen):
+            if num_voiced > threshold:
                 triggered = True
-                voiced_frames.extend((f for f, s in ring_buff))
-                ring_buff.clear()
+                for ring_frame in ring_frames:
+                    voiced_frames += ring_frame
+                ring_frames.clear()
+                ring_flags[:] = False
+                num_flags = num_voiced = 0
 
         else:
-            voiced_frames.append(frame)
-            ring_buff.append((frame, is_speech))
-            num_unvoiced = len([f for f, speech in ring_buff if not speech])
+            voiced_frames += frame
+            num_unvoiced = num_flags - num_voiced
 
-            if num_unvoiced > (act_inact_ratio * ring_buff.maxlen):
+            if num_unvoiced > threshold:
                 triggered = False
 
                 # yield entire voiced frames
-                yield b"".join(voiced_frames)
+                yield bytes(voiced_frames)
 
                 # yield None to mark a break in consecutive but separate voiced
                 # frames so that speech processor can start transcribing the
                 # previously sent voice frames
                 yield None
 
-                ring_buff.clear()
-                voiced_frames = list()
+                ring_flags[:] = False
+                num_flags = num_voiced = 0
+                voiced_frames.clear()
@@ -1,19 +1,26 @@
 from google.cloud import speech
-
-try:
-    # additional explicit imports for compatibility with
-    # google-cloud-speech=1.3.2 for python2
-    from google.cloud.speech import enums
-    from google.cloud.speech import types
-except ImportError:
-    pass
-
+from google.cloud.speech_v1.services.speech.transports import SpeechGrpcTransport
 from pyaudio import paInt16
 from ..audio import AudioInputStreamer
 from .BaseSTT import BaseSTT
 
 
 class GoogleSTT(BaseSTT):
+
+    # audio is sent in requests of this duration to cut down on per request
+    # gRPC framing overhead, buffered audio beyond it, e.g. after a stall, is
+    # split over consecutive requests to stay within the request size limit
+    BATCH_DURATION_MS = 200
+
+    # limit on the audio content of a single streaming recognize request
+    MAX_REQUEST_BYTES = 25600
+
+    # keepalive pings let the channel survive transient disconnects
+    KEEPALIVE_TIME_MS = 30000
+
+    # shared by all instances so that channel setup is paid only once
+    _speech_client = None
+
     def __init__(
         self,
         lang="en-US",
@@ -40,8 +47,28 @@ class GoogleSTT(BaseSTT):
             + getattr(self._text_batch_processor, "animation_phrases", [])
         )
 
+        self._streaming_config = None
+
+    @classmethod
+    def _get_speech_client(cls):
+        if cls._speech_client is None:
+            channel = SpeechGrpcTransport.create_channel(
+                options=[("grpc.keepalive_time_ms", cls.KEEPALIVE_TIME_MS)]
+            )
+            cls._speech_client = speech.SpeechClient(
+                transport=SpeechGrpcTransport(channel=channel)
+            )
+        return cls._speech_client
+
     def _get_speech_client_and_config(self):
-        client = speech.SpeechClient()
+        r"""Streaming config depends only on the instance's immutable settings,
+        so it is built once and reused for every transcription session."""
+        if self._streaming_config is None:
+            self._streaming_config = self._get_streaming_config()
+
+        return self._get_speech_client(), self._streaming_config
+
+    def _get_streaming_config(self):
 
         recognition_config = dict(
             sample_rate_hertz=self._audio_streamer.processing_rate,
@@ -51,28 +78,18 @@ class GoogleSTT(BaseSTT):
             use_enhanced=True,
         )
 
-        try:
-            speech_contexts = speech.SpeechContext(phrases=self._phrases)
-            encoding = speech.RecognitionConfig.AudioEncoding.LINEAR16
-            RecognitionConfig = speech.RecognitionConfig
-            StreamingRecognitionConfig = speech.StreamingRecognitionConfig
-
-        except AttributeError:
-            # Python2 and speech 1.3.2 compatibility
-            speech_contexts = types.SpeechContext(phrases=self._phrases)
-            encoding = enums.RecognitionConfig.AudioEncoding.LINEAR16
-            RecognitionConfig = types.RecognitionConfig
-            StreamingRecognitionConfig = types.StreamingRecognitionConfig
+        speech_contexts = speech.SpeechContext(phrases=self._phrases)
+        encoding = speech.RecognitionConfig.AudioEncoding.LINEAR16
 
-        config = RecognitionConfig(
+        config = speech.RecognitionConfig(
             encoding=encoding, speech_contexts=[speech_contexts], **recognition_config
         )
 
-        streaming_config = StreamingRecognitionConfig(
+        streaming_config = speech.StreamingRecognitionConfig(
             config=config, interim_results=True
         )
 
-        return client, streaming_config
+        return streaming_config
 
     def streaming_transcribe(self):
 
@@ -80,15 +97,14 @@ class GoogleSTT(BaseSTT):
 
         with self._audio_streamer as audio_streamer:
 
-            try:
-                StreamingRecognizeRequest = speech.StreamingRecognizeRequest
-            except AttributeError:
-                # Python2 and speech 1.3.2 compatibility
-                StreamingRecognizeRequest = types.StreamingRecognizeRequest
+            stream = audio_streamer.stream(
+                min_duration_ms=self.BATCH_DURATION_MS,
+                max_duration_ms=self.BATCH_DURATION_MS,
+            )
 
             requests = (
-                StreamingRecognizeRequest(audio_content=stream)
-                for stream in audio_streamer.stream()
+                speech.StreamingRecognizeRequest(audio_content=chunk)
+                for chunk in self._batch_audio(stream)
             )
 
             responses = client.streaming_recognize(streaming_config, requests)
@@ -96,16 +112,45 @@ class GoogleSTT(BaseSTT):
             # Now, put the transcription responses to use.
             self._handle_recognized(responses)
 
-    def _handle_recognized(self, recognized):
+    def _batch_audio(self, stream):
+        r"""Split chunks over MAX_REQUEST_BYTES, as yielded by streamers not
+        bounding their chunk durations such as VAD's voiced segments, into
+        requests of BATCH_DURATION_MS of audio, and drop VAD's None break
+        markers. Other chunks, e.g. of AudioInputStreamer.stream, are passed
+        through uncopied."""
+        sample_width = self._audio_streamer.sample_width
+        batch_bytes = (
+            self._audio_streamer.processing_rate
+            * sample_width
+            * self.BATCH_DURATION_MS
+            // 1000
+        )
+        batch_bytes -= batch_bytes % sample_width
 
-        for response in recognized:
-            if response.results and (
-                len(response.results) > 1 or response.results[0].is_final
-            ):
+        for chunk in stream:
+            if chunk is None:
+                continue
 
-                result = response.results[0]
-                if result.alternatives:
-                    text = result.alternatives[0].transcript
-                    confidence = int(100 * result.alternatives[0].confidence)
+            if len(chunk) <= self.MAX_REQUEST_BYTES:
+                yield chunk
+            else:
+                chunk = memoryview(chunk)
+                for start in range(0, len(chunk), batch_bytes):
+                    yield chunk[start : start + batch_bytes].tobytes()
 
-                    self._process_text(text, reset=result.is_final)
+    def _handle_recognized(self, recognized):
+        process_text = self._process_text
+
+        for response in recognized:
+            # protobuf field accesses are not free, so each is done only once
+            results = response.results
+            if not results:
+                continue
+
+            result = results[0]
+            is_final = result.is_final
+            if len(results) > 1 or is_final:
+
+                alternatives = result.alternatives
+                if alternatives:
+                    process_text(alternatives[0].transcript, reset=is_final)
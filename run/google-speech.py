@@ -50,13 +50,16 @@ if args.text_batcher:
     text_batcher = TextBatcher()
 
 
+# constructed once so that retries reuse the same speech client and config
+google_stt = GoogleSTT(
+    lang=args.lang,
+    text_batcher=text_batcher,
+    text_batch_processor=text_batch_processor,
+)
+
 while True:
     try:
-        GoogleSTT(
-            lang=args.lang,
-            text_batcher=text_batcher,
-            text_batch_processor=text_batch_processor,
-        ).streaming_transcribe()
+        google_stt.streaming_transcribe()
 
     except Exception as exception:
         print(exception)